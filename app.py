@@ -1,17 +1,74 @@
 # Trigger rebuild
 
-import gradio as gr
-import streamlit as st
-import google.generativeai as genai
+import time
+
+STARTUP_STARTED = time.perf_counter()
+
 import os
-from PIL import Image
-from gtts import gTTS
+import io
 import uuid
 import random
 import json
 import re
+import asyncio
+import contextlib
+import contextvars
+import functools
+import importlib
+import inspect
+import hashlib
+import mimetypes
+import threading
+import sqlite3
+import tempfile
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import gradio as gr
+from fastapi.responses import PlainTextResponse
+
+STARTUP_TIMINGS = {"imports": time.perf_counter() - STARTUP_STARTED}
+
+class LazyModule:
+    # Defers importing a heavy SDK until first attribute access and records the
+    # import time in STARTUP_TIMINGS.
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            start = time.perf_counter()
+            module = importlib.import_module(self._name)
+            if self._module is None:
+                self._module = module
+                STARTUP_TIMINGS[f"lazy import {self._name}"] = time.perf_counter() - start
+        return getattr(module, attr)
+
+genai = LazyModule("google.generativeai")
+genai_client = LazyModule("google.generativeai.client")
+gtts = LazyModule("gtts")
 
 API_KEY = os.environ.get("GEMINI_API_KEY")
+MODEL_NAME = 'gemini-1.5-flash-latest'
+CACHE_DB_PATH = os.environ.get("VMPX_CACHE_DB")
+CACHE_TTL_SECONDS = float(os.environ.get("VMPX_CACHE_TTL", 24 * 60 * 60))
+CACHE_DISABLED = os.environ.get("VMPX_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+CACHED_TABS = {"mind_map", "learning_hub", "skill_gap", "goal_planner", "linkedin", "quiz"}
+CASEFOLD_TABS = {"mind_map", "learning_hub"}
+INTERVIEW_WINDOW_TURNS = int(os.environ.get("VMPX_INTERVIEW_WINDOW", 6))
+INTERVIEW_SUMMARY_EVERY = int(os.environ.get("VMPX_INTERVIEW_SUMMARY_EVERY", 4))
+INTERVIEW_TOKEN_BUDGET = int(os.environ.get("VMPX_INTERVIEW_TOKEN_BUDGET", 2000))
+MAX_CONCURRENCY = int(os.environ.get("VMPX_MAX_CONCURRENCY", 16))
+MAX_CONCURRENCY_PER_KEY = int(os.environ.get("VMPX_MAX_CONCURRENCY_PER_KEY", 4))
+MAX_QUEUED_REQUESTS = int(os.environ.get("VMPX_MAX_QUEUED_REQUESTS", 64))
+REQUEST_DEADLINE_SECONDS = float(os.environ.get("VMPX_REQUEST_DEADLINE", 120))
+MAX_RETRIES = int(os.environ.get("VMPX_MAX_RETRIES", 3))
+WARM_UP = os.environ.get("VMPX_WARMUP", "1").lower() not in ("0", "false", "no")
+TRACE_LOG = os.environ.get("VMPX_TRACE_LOG", "").lower() in ("1", "true", "yes")
+ARTIFACT_DIR = os.environ.get("VMPX_ARTIFACT_DIR", os.path.join(tempfile.gettempdir(), "vmpx_artifacts"))
+ARTIFACT_MAX_BYTES = int(os.environ.get("VMPX_ARTIFACT_MAX_BYTES", 256 * 1024 * 1024))
+ARTIFACT_MAX_AGE_SECONDS = float(os.environ.get("VMPX_ARTIFACT_MAX_AGE", 6 * 60 * 60))
 
 CAREER_TIPS = [
     "**Build a Portfolio:** Even small projects showcase your skills. Start a GitHub repository for your code or a Behance profile for your designs.",
@@ -22,33 +79,1105 @@ CAREER_TIPS = [
     "**Stay Curious:** The world is constantly changing. Read news from your industry, follow thought leaders, and never stop asking 'why?'"
 ]
 
-def get_gemini_response(api_key_from_input, system_prompt, user_input_parts=[]):
-    final_api_key = API_KEY if API_KEY else api_key_from_input
+class GeminiClient:
+    # Each client owns its own _ClientManager so that keys never go through the
+    # global genai.configure() state shared by every queue worker.
+    def __init__(self, api_key, model_name=MODEL_NAME):
+        self._clients = genai_client._ClientManager()
+        self._clients.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+        self.model._client = self._clients.get_default_client("generative")
+
+    def generate_content(self, contents, **kwargs):
+        return self.model.generate_content(contents, **kwargs)
+
+    def start_chat(self, history=None):
+        return self.model.start_chat(history=history)
+
+    def upload_file(self, path, mime_type=None):
+        file_client = self._clients.get_default_client("file")
+        mime_type = mime_type or mimetypes.guess_type(path)[0]
+        response = file_client.create_file(path=path, mime_type=mime_type, display_name=os.path.basename(path))
+        return genai.types.File(response)
+
+class GeminiClientPool:
+    # Bounded LRU of clients keyed by a hash of the API key. `factory` can be
+    # swapped for a local fake exposing generate_content/upload_file.
+    def __init__(self, factory=GeminiClient, max_size=32, idle_ttl=30 * 60):
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "setup_seconds": 0.0}
+
+    def get(self, api_key):
+        key = hashlib.sha256(api_key.encode()).hexdigest()
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                entry[1] = now
+                self._clients.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[0]
+            self.stats["misses"] += 1
+
+        # Build outside the lock so a slow setup for one key does not stall the others.
+        start = time.perf_counter()
+        client = self.factory(api_key)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.stats["setup_seconds"] += elapsed
+            entry = self._clients.get(key)
+            if entry is not None:
+                # Another worker built the same key first; keep theirs.
+                entry[1] = now
+                self._clients.move_to_end(key)
+                return entry[0]
+            self._clients[key] = [client, now]
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+                self.stats["evictions"] += 1
+            return client
+
+    def _evict_idle(self, now):
+        while self._clients:
+            key, (client, last_used) = next(iter(self._clients.items()))
+            if now - last_used < self.idle_ttl:
+                break
+            del self._clients[key]
+            self.stats["evictions"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, size=len(self._clients))
+
+GEMINI_CLIENTS = GeminiClientPool()
+
+def resolve_api_key(api_key_from_input):
+    return API_KEY if API_KEY else api_key_from_input
+
+def file_path(uploaded_file):
+    # gr.File passes a path string on Gradio 4+ and a tempfile wrapper on older versions.
+    return getattr(uploaded_file, "name", uploaded_file)
+
+def hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class FileUploadManager:
+    # Uploads run on a worker pool so callers can build the prompt meanwhile.
+    # Handles are keyed on (API key, file content) and reused until they expire;
+    # Gemini keeps uploaded files for 48 hours.
+    def __init__(self, clients=GEMINI_CLIENTS, max_workers=4, ttl=47 * 60 * 60, max_entries=256):
+        self.clients = clients
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upload")
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "bytes_uploaded": 0, "upload_seconds": 0.0}
+
+    def submit(self, api_key_from_input, path):
+        return self.executor.submit(self._timed_upload, resolve_api_key(api_key_from_input), path, current_trace())
+
+    def _timed_upload(self, api_key, path, trace):
+        start = time.perf_counter()
+        try:
+            return self._upload(api_key, path)
+        finally:
+            if trace: trace.add("upload", time.perf_counter() - start)
+
+    def _upload(self, api_key, path):
+        if not api_key:
+            raise ValueError("API Key not found. Please provide your key or set it up in your deployment environment.")
+        key = (hashlib.sha256(api_key.encode()).hexdigest(), hash_file(path))
+        with self._lock:
+            entry = self._handles.get(key)
+            if entry is not None and entry[1] > time.time():
+                self._handles.move_to_end(key)
+                self.stats["hits"] += 1
+                pending = entry[0]
+            else:
+                # Concurrent requests for the same file wait on this future instead of re-uploading.
+                pending = None
+                future = Future()
+                self._handles[key] = (future, time.time() + self.ttl)
+                while len(self._handles) > self.max_entries:
+                    self._handles.popitem(last=False)
+                self.stats["misses"] += 1
+        if pending is not None:
+            return pending.result()
+
+        start = time.perf_counter()
+        try:
+            handle = self.clients.get(api_key).upload_file(path)
+        except Exception as e:
+            with self._lock:
+                self._handles.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self.stats["bytes_uploaded"] += os.path.getsize(path)
+            self.stats["upload_seconds"] += time.perf_counter() - start
+            expiration = getattr(handle, "expiration_time", None)
+            if expiration is not None and key in self._handles:
+                expires = min(self._handles[key][1], expiration.timestamp() - 60 * 60)
+                self._handles[key] = (future, expires)
+        future.set_result(handle)
+        return handle
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, cached=len(self._handles))
+
+FILE_UPLOADS = FileUploadManager()
+
+class EngineBusy(Exception):
+    pass
+
+class RequestTimeout(Exception):
+    pass
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_END = object()
+
+class RequestEngine:
+    # Runs blocking SDK calls from an asyncio loop on a background thread. Calls
+    # take a global and a per-key slot, wait in a bounded queue (rejected at once
+    # when full), retry 429/5xx with jittered exponential backoff and share one
+    # deadline across queueing, retries and streaming. Timed-out SDK calls are
+    # abandoned, not interrupted, so the executor is sized with headroom. The
+    # deployment key is shared by every user, so it is only bound by the global limit.
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, per_key_concurrency=MAX_CONCURRENCY_PER_KEY, max_queue=MAX_QUEUED_REQUESTS,
+                 deadline=REQUEST_DEADLINE_SECONDS, max_retries=MAX_RETRIES, backoff_base=0.5, backoff_cap=8.0, stream_buffer=64,
+                 deployment_key=API_KEY):
+        self.max_concurrency = max_concurrency
+        self.per_key_concurrency = per_key_concurrency
+        self.deployment_key = deployment_key
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.stream_buffer = stream_buffer
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency * 2, thread_name_prefix="gemini")
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._key_slots = {}
+        self._waiting = 0
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self.stats = {"completed": 0, "failed": 0, "rejected": 0, "timeouts": 0, "retries": 0}
+
+    def _ensure_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="request-engine", daemon=True).start()
+            return self._loop
+
+    def run(self, api_key, fn, deadline=None):
+        return asyncio.run_coroutine_threadsafe(self._run(api_key, fn, deadline, current_trace()), self._ensure_loop()).result()
+
+    def stream(self, api_key, fn, deadline=None):
+        # `fn` returns an iterator of chunks. Retries only happen before the first
+        # chunk. A pump task holds the slot and feeds a bounded buffer, so a caller
+        # that stops reading (e.g. a cancelled Gradio event, whose generator is left
+        # suspended) blocks the pump on a full buffer until the deadline frees the slot.
+        loop = self._ensure_loop()
+        trace = current_trace()
+
+        async def start():
+            buffer = asyncio.Queue(self.stream_buffer)
+            task = loop.create_task(self._pump(api_key, fn, deadline, buffer, trace))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            return buffer, task
+
+        async def next_chunk():
+            get = asyncio.ensure_future(buffer.get())
+            await asyncio.wait({get, task}, return_when=asyncio.FIRST_COMPLETED)
+            if get.done():
+                return get.result()
+            get.cancel()
+            return buffer.get_nowait() if not buffer.empty() else task.result()
+
+        buffer, task = asyncio.run_coroutine_threadsafe(start(), loop).result()
+        try:
+            while True:
+                chunk = asyncio.run_coroutine_threadsafe(next_chunk(), loop).result()
+                if chunk is _END:
+                    return
+                yield chunk
+        finally:
+            loop.call_soon_threadsafe(task.cancel)
+
+    async def _run(self, api_key, fn, deadline, trace=None):
+        deadline = asyncio.get_running_loop().time() + (deadline or self.deadline)
+        async with self._slot(api_key, deadline, trace):
+            result = await self._call(fn, deadline)
+        self.stats["completed"] += 1
+        return result
+
+    async def _pump(self, api_key, fn, deadline, buffer, trace=None):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (deadline or self.deadline)
+        async with self._slot(api_key, deadline, trace):
+            def start():
+                iterator = iter(fn())
+                return iterator, next(iterator, _END)
+            iterator, chunk = await self._call(start, deadline)
+            while chunk is not _END:
+                await self._wait(buffer.put(chunk), deadline)
+                chunk = await self._wait(loop.run_in_executor(self.executor, next, iterator, _END), deadline)
+        self.stats["completed"] += 1
+        return _END
+
+    @contextlib.asynccontextmanager
+    async def _slot(self, api_key, deadline, trace=None):
+        if self._waiting >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise EngineBusy("Too many requests are waiting")
+        key = hashlib.sha256(api_key.encode()).hexdigest()
+        limit = self.max_concurrency if self.deployment_key and api_key == self.deployment_key else self.per_key_concurrency
+        entry = self._key_slots.setdefault(key, [asyncio.Semaphore(limit), 0])
+        entry[1] += 1
+        self._waiting += 1
+        queued_at = time.perf_counter()
+        try:
+            try:
+                await self._wait(self._acquire(entry[0]), deadline)
+            finally:
+                self._waiting -= 1
+                if trace: trace.add("queue_wait", time.perf_counter() - queued_at)
+            try:
+                yield
+            finally:
+                entry[0].release()
+                self._global.release()
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._key_slots[key]
+
+    async def _acquire(self, key_semaphore):
+        await key_semaphore.acquire()
+        try:
+            await self._global.acquire()
+        except BaseException:
+            key_semaphore.release()
+            raise
+
+    async def _call(self, fn, deadline):
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._wait(loop.run_in_executor(self.executor, fn), deadline)
+            except Exception as e:
+                if getattr(e, "code", None) not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    if not isinstance(e, RequestTimeout):
+                        self.stats["failed"] += 1
+                    raise
+                # Full jitter keeps many clients that hit a 429 together from retrying in lockstep.
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                if loop.time() + delay >= deadline:
+                    self.stats["failed"] += 1
+                    raise
+                self.stats["retries"] += 1
+                await asyncio.sleep(delay)
+
+    async def _wait(self, awaitable, deadline):
+        try:
+            return await asyncio.wait_for(awaitable, max(0, deadline - asyncio.get_running_loop().time()))
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise RequestTimeout("The request deadline was exceeded") from None
+
+    def snapshot(self):
+        return dict(self.stats, waiting=self._waiting)
+
+REQUEST_ENGINE = RequestEngine()
+
+def describe_error(e):
+    if isinstance(e, EngineBusy):
+        return "VMPX is handling a lot of requests right now. Please try again in a few seconds."
+    if isinstance(e, RequestTimeout):
+        return "The request took too long to complete. Please try again."
+    if getattr(e, "code", None) == 429:
+        return "The Gemini API rate limit was reached. Please wait a moment and try again."
+    return f"An error occurred while generating the response: {e}"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, handler, value):
+        with self._lock:
+            series = self._series.setdefault(handler, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def summary(self):
+        with self._lock:
+            return {handler: {"count": count, "mean": total / count} for handler, (_, total, count) in self._series.items() if count}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for handler, (counts, total, count) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{handler="{handler}",le="{bound}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{handler="{handler}",le="+Inf"}} {count}')
+                lines.append(f'{self.name}_sum{{handler="{handler}"}} {total}')
+                lines.append(f'{self.name}_count{{handler="{handler}"}} {count}')
+        return lines
+
+STAGE_HISTOGRAMS = {
+    "queue_wait": Histogram("vmpx_queue_wait_seconds", "Time spent waiting for a Gemini request slot."),
+    "prompt_build": Histogram("vmpx_prompt_build_seconds", "Time from handler start until the first Gemini request is issued, including upload waits."),
+    "upload": Histogram("vmpx_upload_seconds", "Time spent uploading (or reusing) files for Gemini."),
+    "ttft": Histogram("vmpx_time_to_first_token_seconds", "Time from issuing a Gemini request to its first text."),
+    "generation": Histogram("vmpx_generation_seconds", "Total time spent in Gemini generation calls."),
+    "tts": Histogram("vmpx_tts_seconds", "Total time spent synthesizing speech."),
+    "total": Histogram("vmpx_request_seconds", "End-to-end handler time."),
+    "output_bytes": Histogram("vmpx_output_bytes", "Bytes of text and audio returned to the UI.", BYTES_BUCKETS),
+}
+
+CURRENT_TRACE = contextvars.ContextVar("vmpx_trace", default=None)
+
+def current_trace():
+    return CURRENT_TRACE.get()
+
+class RequestTrace:
+    # Per-request stage totals; observed into STAGE_HISTOGRAMS once the handler
+    # finishes. Worker threads get the trace passed in explicitly.
+    def __init__(self, handler):
+        self.handler = handler
+        self.id = uuid.uuid4().hex[:12]
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.output_bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_once(self, stage, seconds):
+        with self._lock:
+            self.stages.setdefault(stage, seconds)
+
+    def generation_started(self):
+        self.add_once("prompt_build", time.perf_counter() - self.start)
+
+    def finish(self):
+        self.stages["total"] = time.perf_counter() - self.start
+        for stage, seconds in self.stages.items():
+            STAGE_HISTOGRAMS[stage].observe(self.handler, seconds)
+        STAGE_HISTOGRAMS["output_bytes"].observe(self.handler, self.output_bytes)
+        if TRACE_LOG:
+            print(json.dumps({"trace": self.id, "handler": self.handler, "output_bytes": self.output_bytes, **{stage: round(seconds, 4) for stage, seconds in self.stages.items()}}))
+
+def payload_bytes(value):
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(payload_bytes(item) for item in value)
+    return 0
+
+def instrument(fn):
+    # Wraps a Gradio handler so everything it calls can find the trace through
+    # CURRENT_TRACE. Gradio steps generators from different threads, so the
+    # variable is set around every step rather than once.
+    if inspect.isgeneratorfunction(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = RequestTrace(fn.__name__)
+            outputs = fn(*args, **kwargs)
+            value = None
+            try:
+                while True:
+                    token = CURRENT_TRACE.set(trace)
+                    try:
+                        value = next(outputs)
+                    except StopIteration:
+                        return
+                    finally:
+                        CURRENT_TRACE.reset(token)
+                    # Streamed audio arrives as separate byte chunks; text is counted once, from the final output.
+                    if isinstance(value, tuple):
+                        trace.output_bytes += sum(len(item) for item in value if isinstance(item, bytes))
+                    yield value
+            finally:
+                outputs.close()
+                if isinstance(value, tuple):
+                    trace.output_bytes += payload_bytes([item for item in value if not isinstance(item, bytes)])
+                else:
+                    trace.output_bytes += payload_bytes(value)
+                trace.finish()
+        return wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        trace = RequestTrace(fn.__name__)
+        token = CURRENT_TRACE.set(trace)
+        value = None
+        try:
+            value = fn(*args, **kwargs)
+            return value
+        finally:
+            CURRENT_TRACE.reset(token)
+            trace.output_bytes = payload_bytes(value)
+            trace.finish()
+    return wrapper
+
+def render_metrics():
+    lines = []
+    for histogram in STAGE_HISTOGRAMS.values():
+        lines += histogram.render()
+    lines += ["# HELP vmpx_component_stat Counters from the client pool, caches, uploads and request engine.", "# TYPE vmpx_component_stat gauge"]
+    components = {
+        "client_pool": GEMINI_CLIENTS.snapshot(),
+        "uploads": FILE_UPLOADS.snapshot(),
+        "engine": REQUEST_ENGINE.snapshot(),
+        "coalescing": IN_FLIGHT.snapshot(),
+        "artifacts": ARTIFACTS.snapshot(),
+    }
+    for tab, counters in RESPONSE_CACHE.snapshot().items():
+        components[f"response_cache_{tab}"] = counters
+    for component, stats in components.items():
+        for stat, value in stats.items():
+            lines.append(f'vmpx_component_stat{{component="{component}",stat="{stat}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+def mount_metrics(app):
+    app.add_api_route("/metrics", lambda: PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4"), methods=["GET"])
+
+def prompt_fingerprint(system_prompt, user_input_parts, model_name=MODEL_NAME, casefold=False):
+    # Returns None for prompts with uploaded files, which are never cached or coalesced.
+    # Whitespace is always normalized; case only for short topic inputs, since a
+    # capitalization fix in free text should produce a fresh reply.
+    if not all(isinstance(part, str) for part in user_input_parts):
+        return None
+    normalized = [" ".join(part.split()) for part in user_input_parts]
+    if casefold:
+        normalized = [part.casefold() for part in normalized]
+    payload = json.dumps([model_name, system_prompt, normalized])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def flight_key(api_key, fingerprint):
+    # Identical prompts only share an upstream call under the same API key, so a
+    # request with a bad key never fails (or succeeds) on another key's behalf.
+    if fingerprint is None:
+        return None
+    return hashlib.sha256(api_key.encode()).hexdigest() + ":" + fingerprint
+
+class ResponseCache:
+    # Content-addressed cache for tabs whose output depends only on the prompt.
+    # An in-memory LRU sits in front of an optional SQLite tier; both honour `ttl`.
+    def __init__(self, tabs=CACHED_TABS, max_entries=512, ttl=CACHE_TTL_SECONDS, db_path=CACHE_DB_PATH, enabled=not CACHE_DISABLED):
+        self.tabs = set(tabs)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, created REAL)")
+            self._db.commit()
+        self.stats = {}
+
+    def enabled_for(self, tab):
+        return self.enabled and tab in self.tabs
+
+    def get(self, tab, key):
+        now = time.time()
+        value = None
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                value = entry[0]
+            elif self._db is not None:
+                row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row and now - row[1] < self.ttl:
+                    value = row[0]
+                    self._remember(key, value, row[1])
+            self._count(tab, "hits" if value is not None else "misses")
+        return value
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, value, now))
+                self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+                self._db.commit()
+
+    def _remember(self, key, value, created):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _count(self, tab, field):
+        counters = self.stats.setdefault(tab, {"hits": 0, "misses": 0})
+        counters[field] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                tab: dict(counters, hit_rate=counters["hits"] / max(1, counters["hits"] + counters["misses"]))
+                for tab, counters in self.stats.items()
+            }
+
+RESPONSE_CACHE = ResponseCache()
+
+class Flight:
+    # One upstream call that several identical requests are waiting on. Only the
+    # latest value is kept, so streaming followers always see the newest text.
+    def __init__(self, key):
+        self.key = key
+        self._cond = threading.Condition()
+        self._value = None
+        self._version = 0
+        self._done = False
+        self._error = None
+
+    def publish(self, value):
+        with self._cond:
+            self._value = value
+            self._version += 1
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            if not self._done:
+                self._done = True
+                self._error = error
+                self._cond.notify_all()
+
+    def follow(self, timeout=None):
+        seen = 0
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self._cond:
+                while self._version == seen and not self._done:
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        raise RequestTimeout("The shared request did not finish before the deadline")
+                    self._cond.wait(remaining)
+                changed = self._version != seen
+                seen, value, done, error = self._version, self._value, self._done, self._error
+            if changed:
+                yield value
+            if done:
+                if error is not None:
+                    raise error
+                return
+
+    def result(self, timeout=None):
+        value = None
+        for value in self.follow(timeout):
+            pass
+        return value
+
+class SingleFlight:
+    # Concurrent requests with the same prompt fingerprint share one upstream call.
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.stats = {"leaders": 0, "coalesced": 0}
+
+    def join(self, key):
+        # Returns (flight, is_leader); only the leader calls upstream and lands the flight.
+        if key is None:
+            return Flight(None), True
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.stats["coalesced"] += 1
+                return flight, False
+            flight = self._flights[key] = Flight(key)
+            self.stats["leaders"] += 1
+            return flight, True
+
+    def land(self, flight):
+        flight.finish(RuntimeError("The shared request was cancelled"))
+        if flight.key is not None:
+            with self._lock:
+                if self._flights.get(flight.key) is flight:
+                    del self._flights[flight.key]
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, in_flight=len(self._flights))
+
+IN_FLIGHT = SingleFlight()
+
+def get_gemini_response(api_key_from_input, system_prompt, user_input_parts=[], tab="default", validate=None):
+    # `validate(text)` must return True before a reply is cached, so a malformed
+    # reply is regenerated on retry instead of being served from the cache.
+    final_api_key = resolve_api_key(api_key_from_input)
     if not final_api_key:
         return "API Key not found. Please provide your key or set it up in your deployment environment."
 
+    fingerprint = prompt_fingerprint(system_prompt, user_input_parts, casefold=tab in CASEFOLD_TABS)
+    cache_key = fingerprint if RESPONSE_CACHE.enabled_for(tab) else None
+    if cache_key:
+        cached = RESPONSE_CACHE.get(tab, cache_key)
+        if cached is not None:
+            return cached
+
     try:
-        genai.configure(api_key=final_api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash-latest')
+        model = GEMINI_CLIENTS.get(final_api_key)
     except Exception as e:
         return f"API Key Configuration Error: {e}"
 
+    flight, leader = IN_FLIGHT.join(flight_key(final_api_key, fingerprint))
+    if not leader:
+        try:
+            return flight.result(REQUEST_ENGINE.deadline)
+        except Exception as e:
+            return describe_error(e)
+
     full_prompt = [system_prompt] + user_input_parts
+    trace = current_trace()
+    if trace: trace.generation_started()
+    start = time.perf_counter()
     try:
-        response = model.generate_content(full_prompt)
-        return response.text
+        text = REQUEST_ENGINE.run(final_api_key, lambda: model.generate_content(full_prompt).text)
+        if trace:
+            trace.add_once("ttft", time.perf_counter() - start)
+            trace.add("generation", time.perf_counter() - start)
+        flight.publish(text)
+        flight.finish()
+        if cache_key and (validate is None or validate(text)):
+            RESPONSE_CACHE.set(cache_key, text)
+        return text
     except Exception as e:
-        return f"An error occurred while generating the response: {e}"
+        flight.finish(e)
+        return describe_error(e)
+    finally:
+        IN_FLIGHT.land(flight)
+
+def stream_gemini_response(api_key_from_input, system_prompt, user_input_parts=[], tab="default"):
+    # Yields the accumulated reply text as chunks arrive.
+    final_api_key = resolve_api_key(api_key_from_input)
+    if not final_api_key:
+        yield "API Key not found. Please provide your key or set it up in your deployment environment."
+        return
+
+    fingerprint = prompt_fingerprint(system_prompt, user_input_parts, casefold=tab in CASEFOLD_TABS)
+    cache_key = fingerprint if RESPONSE_CACHE.enabled_for(tab) else None
+    if cache_key:
+        cached = RESPONSE_CACHE.get(tab, cache_key)
+        if cached is not None:
+            yield cached
+            return
 
-def text_to_speech(text):
     try:
-        tts = gTTS(text=text, lang='en', tld='co.in', slow=False)
-        filename = f"/tmp/output_{uuid.uuid4()}.mp3"
-        tts.save(filename)
-        return filename
+        model = GEMINI_CLIENTS.get(final_api_key)
     except Exception as e:
-        print(f"Error in TTS: {e}")
-        return None
+        yield f"API Key Configuration Error: {e}"
+        return
+
+    flight, leader = IN_FLIGHT.join(flight_key(final_api_key, fingerprint))
+    if leader:
+        full_prompt = [system_prompt] + user_input_parts
+        generate = lambda: model.generate_content(full_prompt, stream=True)
+        threading.Thread(target=contextvars.copy_context().run, args=(pump_flight, flight, final_api_key, generate, cache_key), name="flight", daemon=True).start()
+
+    # The leader reads the flight like every follower, so cancelling any one
+    # request leaves the upstream call, and everyone else waiting on it, intact.
+    text = ""
+    trace = current_trace()
+    if trace: trace.generation_started()
+    start = time.perf_counter()
+    try:
+        for text in flight.follow(REQUEST_ENGINE.deadline):
+            if trace: trace.add_once("ttft", time.perf_counter() - start)
+            yield text
+    except Exception as e:
+        yield f"{text}\n\n{describe_error(e)}".lstrip()
+    finally:
+        if trace: trace.add("generation", time.perf_counter() - start)
+
+def pump_flight(flight, api_key, generate, cache_key):
+    # Runs on its own thread and publishes the accumulated text to the flight.
+    text = ""
+    try:
+        for chunk in REQUEST_ENGINE.stream(api_key, generate):
+            if not chunk.text: continue
+            text += chunk.text
+            flight.publish(text)
+        if cache_key and text:
+            RESPONSE_CACHE.set(cache_key, text)
+        flight.finish()
+    except Exception as e:
+        flight.finish(e)
+    finally:
+        IN_FLIGHT.land(flight)
+
+def parse_video_list(text):
+    # Learning Hub replies are a JSON list of {"title", "video_id"}, sometimes in a ```json fence.
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:-3].strip()
+    return [(video.get("title", "No Title"), video.get("video_id", "")) for video in json.loads(text)]
+
+def is_video_list(text):
+    try:
+        parse_video_list(text)
+        return True
+    except (json.JSONDecodeError, TypeError, AttributeError):
+        return False
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English; avoids a count_tokens round trip.
+    return len(text) // 4 + 1
+
+class InterviewSession:
+    # Multi-turn mock interview. Only the last `window_turns` exchanges are sent
+    # verbatim; older ones are folded into a running summary every
+    # `summary_every` turns, or sooner if the prompt would exceed `token_budget`.
+    def __init__(self, role, first_question, window_turns=INTERVIEW_WINDOW_TURNS, summary_every=INTERVIEW_SUMMARY_EVERY, token_budget=INTERVIEW_TOKEN_BUDGET):
+        self.role = role
+        self.window_turns = window_turns
+        self.summary_every = summary_every
+        self.token_budget = token_budget
+        self.display = [(None, first_question)]
+        self.turns = []
+        self.question = first_question
+        self.summary = ""
+        self.stats = []
+
+    def system_prompt(self):
+        prompt = f"You are a hiring manager continuing a mock interview for a '{self.role}' position. The candidate's previous answers are in the chat history. Ask the next logical question based on their last answer, or provide brief feedback and then ask the next question. Keep the interview flowing."
+        if self.summary:
+            prompt += f"\n\nSummary of the earlier part of the interview:\n{self.summary}"
+        return prompt
+
+    def build_history(self):
+        history = [{"role": "user", "parts": [self.system_prompt()]}]
+        for question, answer in self.turns:
+            history.append({"role": "model", "parts": [question]})
+            history.append({"role": "user", "parts": [answer]})
+        history.append({"role": "model", "parts": [self.question]})
+        return history
+
+    def prompt_tokens(self, answer):
+        return estimate_tokens(answer) + sum(estimate_tokens(content["parts"][0]) for content in self.build_history())
+
+    def answer(self, api_key_from_input, answer):
+        final_api_key = resolve_api_key(api_key_from_input)
+        if not final_api_key:
+            self.display.append((answer, "API Key not found. Please provide your key or set it up in your deployment environment."))
+            return
+        try:
+            model = GEMINI_CLIENTS.get(final_api_key)
+        except Exception as e:
+            self.display.append((answer, f"API Key Configuration Error: {e}"))
+            return
+
+        trace = current_trace()
+        if trace: trace.generation_started()
+        self._compact(final_api_key, model, answer)
+        prompt_tokens = self.prompt_tokens(answer)
+        start = time.perf_counter()
+        try:
+            history = self.build_history()
+            response = REQUEST_ENGINE.run(final_api_key, lambda: model.start_chat(history=history).send_message(answer))
+            next_question = response.text
+        except Exception as e:
+            self.display.append((answer, describe_error(e)))
+            return
+        finally:
+            if trace: trace.add("generation", time.perf_counter() - start)
+        if trace: trace.add_once("ttft", time.perf_counter() - start)
+        usage = getattr(response, "usage_metadata", None)
+        self.stats.append({
+            "turn": len(self.display),
+            "prompt_tokens": getattr(usage, "prompt_token_count", None) or prompt_tokens,
+            "seconds": time.perf_counter() - start,
+        })
+        self.turns.append((self.question, answer))
+        self.question = next_question
+        self.display.append((answer, next_question))
+
+    def _compact(self, api_key, model, answer):
+        overflow = len(self.turns) - self.window_turns
+        over_budget = self.prompt_tokens(answer) > self.token_budget
+        if overflow < self.summary_every and not (over_budget and self.turns):
+            return
+        keep = min(self.window_turns, len(self.turns))
+        if over_budget:
+            keep //= 2
+        split = len(self.turns) - keep
+        older, self.turns = self.turns[:split], self.turns[split:]
+        self.summary = self._summarize(api_key, model, older)
+
+    def _summarize(self, api_key, model, turns):
+        transcript = "\n".join(f"Interviewer: {question}\nCandidate: {answer}" for question, answer in turns)
+        prompt = [
+            "You keep running notes for a mock interview. Merge the new exchanges into the existing summary. Keep the role, topics covered, strengths, weaknesses and any unanswered threads. Reply with the updated summary only, in under 150 words.",
+            f"Existing summary:\n{self.summary or '(none)'}\n\nNew exchanges:\n{transcript}",
+        ]
+        try:
+            summary = REQUEST_ENGINE.run(api_key, lambda: model.generate_content(prompt).text).strip()
+        except Exception as e:
+            print(f"Error summarizing interview: {e}")
+            summary = f"{self.summary}\n{transcript}".strip()
+        # Never let the summary alone use more than half of the budget.
+        return summary[-self.token_budget * 2:]
+
+class ArtifactStore:
+    # Directory for generated audio and exports, capped by total size and file
+    # age. A background thread evicts expired files and then least recently used
+    # ones; it wakes every `sweep_interval` seconds or as soon as a write goes
+    # over the cap. Gradio copies returned files into its own cache, which
+    # build_interface ages out on the same schedule via delete_cache.
+    def __init__(self, directory=ARTIFACT_DIR, max_bytes=ARTIFACT_MAX_BYTES, max_age=ARTIFACT_MAX_AGE_SECONDS, sweep_interval=60):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.sweep_interval = sweep_interval
+        self._files = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sweeper = None
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "evicted_bytes": 0}
+        os.makedirs(directory, exist_ok=True)
+        # Pick up files left by a previous run, oldest access first.
+        entries = [entry for entry in os.scandir(directory) if entry.is_file()]
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_atime):
+            stat = entry.stat()
+            self._files[entry.name] = (stat.st_size, stat.st_mtime)
+            self._bytes += stat.st_size
+
+    def read(self, key, suffix):
+        name = key + suffix
+        with self._lock:
+            if name not in self._files:
+                self.stats["misses"] += 1
+                return None
+            self._files.move_to_end(name)
+        try:
+            with open(os.path.join(self.directory, name), "rb") as f:
+                data = f.read()
+        except OSError:
+            with self._lock:
+                self._forget(name)
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            self.stats["hits"] += 1
+        return data
+
+    def write(self, key, suffix, data):
+        name = key + suffix
+        path = os.path.join(self.directory, name)
+        partial = f"{path}.{uuid.uuid4().hex}.part"
+        with open(partial, "wb") as f:
+            f.write(data)
+        os.replace(partial, path)
+        self._register(name)
+        return path
+
+    @contextlib.contextmanager
+    def create(self, prefix, suffix):
+        # Yields a text file opened for writing; it is tracked once closed.
+        name = f"{prefix}_{uuid.uuid4()}{suffix}"
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                yield f
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            raise
+        self._register(name)
+
+    def _register(self, name):
+        size = os.path.getsize(os.path.join(self.directory, name))
+        with self._lock:
+            self._forget(name)
+            self._files[name] = (size, time.time())
+            self._bytes += size
+            over = self._bytes > self.max_bytes
+        self._ensure_sweeper()
+        if over:
+            self._wake.set()
+
+    def _forget(self, name):
+        entry = self._files.pop(name, None)
+        if entry is not None:
+            self._bytes -= entry[0]
+
+    def _ensure_sweeper(self):
+        with self._lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(target=self._sweep_forever, name="artifact-sweeper", daemon=True)
+                self._sweeper.start()
+
+    def _sweep_forever(self):
+        while True:
+            self._wake.wait(self.sweep_interval)
+            self._wake.clear()
+            self.evict()
+
+    def evict(self):
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            expired = [name for name, (_, created) in self._files.items() if created < cutoff]
+            victims = [(name, self._files[name][0]) for name in expired]
+            for name in expired:
+                self._forget(name)
+            names = iter(list(self._files))
+            while self._bytes > self.max_bytes:
+                name = next(names)
+                victims.append((name, self._files[name][0]))
+                self._forget(name)
+            self.stats["evictions"] += len(victims)
+            self.stats["evicted_bytes"] += sum(size for _, size in victims)
+        for name, _ in victims:
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(self.directory, name))
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, bytes_on_disk=self._bytes, files=len(self._files))
+
+ARTIFACTS = ArtifactStore()
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+
+def synthesize_speech(text, lang='en', tld='co.in'):
+    # Identical sentences (repeated tips, cached tab answers) reuse the same audio.
+    key = hashlib.sha256(f"{lang}|{tld}|{text}".encode()).hexdigest()
+    audio = ARTIFACTS.read(key, ".mp3")
+    if audio is None:
+        buffer = io.BytesIO()
+        gtts.gTTS(text=text, lang=lang, tld=tld, slow=False).write_to_fp(buffer)
+        audio = buffer.getvalue()
+        ARTIFACTS.write(key, ".mp3", audio)
+    return audio
+
+TTS_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts")
+
+class SpeechPipeline:
+    # Splits a reply into sentences while it is still streaming and synthesizes
+    # each one on TTS_EXECUTOR. MP3 segments are returned in order, so the first
+    # sentence can start playing while later ones are still being generated.
+    # At most `window` sentences per pipeline are on the shared executor at once,
+    # so a new chat's first sentence is not queued behind whole earlier replies.
+    def __init__(self, synthesize=synthesize_speech, executor=TTS_EXECUTOR, min_chars=20, window=2):
+        self.synthesize = synthesize
+        self.executor = executor
+        self.min_chars = min_chars
+        self.window = window
+        self.trace = current_trace()
+        self._consumed = 0
+        self._pending = deque()
+        self._futures = deque()
+        self._lock = threading.RLock()
+
+    def feed(self, text):
+        # `text` is the full reply so far; only complete sentences are queued and
+        # sentences shorter than min_chars are merged with the next one.
+        start = self._consumed
+        for match in SENTENCE_END.finditer(text, self._consumed):
+            if len(text[start:match.start()].strip()) >= self.min_chars:
+                self._submit(text[start:match.start()].strip())
+                start = match.end()
+        self._consumed = start
+
+    def finish(self, text):
+        remainder = text[self._consumed:].strip()
+        if remainder:
+            self._submit(remainder)
+        self._consumed = len(text)
+
+    def _submit(self, sentence):
+        with self._lock:
+            self._pending.append(sentence)
+        self._fill()
+
+    def _fill(self, _=None):
+        # Also runs as a done callback, so the next sentence starts as soon as a
+        # worker frees up rather than when the handler next polls.
+        with self._lock:
+            while self._pending and sum(not future.done() for future in self._futures) < self.window:
+                future = self.executor.submit(self._run, self._pending.popleft())
+                self._futures.append(future)
+                future.add_done_callback(self._fill)
+
+    def _run(self, sentence):
+        start = time.perf_counter()
+        try:
+            return self.synthesize(sentence)
+        except Exception as e:
+            print(f"Error in TTS: {e}")
+            return None
+        finally:
+            if self.trace: self.trace.add("tts", time.perf_counter() - start)
+
+    def take_ready(self):
+        # Audio for every leading sentence that has finished, without blocking.
+        audio = []
+        with self._lock:
+            while self._futures and self._futures[0].done():
+                audio.append(self._futures.popleft().result())
+        self._fill()
+        return b"".join(a for a in audio if a)
+
+    def drain(self):
+        while True:
+            self._fill()
+            with self._lock:
+                if not self._futures:
+                    return
+                future = self._futures.popleft()
+            audio = future.result()
+            if audio:
+                yield audio
+
+def warm_up():
+    # Imports the SDKs and builds the deployment key's client off the request
+    # path, so the first user does not pay for them.
+    start = time.perf_counter()
+    try:
+        genai.GenerativeModel
+        gtts.gTTS
+        if API_KEY: GEMINI_CLIENTS.get(API_KEY)
+    except Exception as e:
+        print(f"Error during warm-up: {e}")
+    STARTUP_TIMINGS["warm-up (background)"] = time.perf_counter() - start
+    print(f"Warm-up finished in {STARTUP_TIMINGS['warm-up (background)']:.2f}s")
+
+def startup_report():
+    return "Startup: " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in STARTUP_TIMINGS.items())
 
 def build_interface():
     dark_theme = gr.themes.Base(primary_hue=gr.themes.colors.purple, secondary_hue=gr.themes.colors.blue, neutral_hue=gr.themes.colors.gray).set(
@@ -58,7 +1187,10 @@ def build_interface():
         button_primary_background_fill_hover="#5B21B6",
     )
 
-    with gr.Blocks(theme=dark_theme, css="""
+    # Exports and audio are copied into Gradio's cache when served; without
+    # delete_cache those copies are never removed.
+    max_age = max(1, int(ARTIFACT_MAX_AGE_SECONDS))
+    with gr.Blocks(theme=dark_theme, delete_cache=(min(60 * 60, max_age), max_age), css="""
         .gradio-container { background-color: #121212; } #chatbot .user { background-color: #1E1E1E !important; }
         #chatbot .bot { background-color: #282A36 !important; } .gradio-audio>div>audio{ background-color: #2B2B2B; }
         """) as demo:
@@ -93,7 +1225,7 @@ def build_interface():
                         chatbot = gr.Chatbot(elem_id="chatbot", label="VMPX Counsel", height=600,
                             value=[[None, "Hello! I am VMPX. Use the controls on the left or type your question below."]],
                             avatar_images=(None, "https://i.ibb.co/3fdnJpD/nirvana-logo.png"))
-                        audio_output = gr.Audio(visible=False, autoplay=True)
+                        audio_output = gr.Audio(visible=False, autoplay=True, streaming=True)
                         with gr.Row():
                             msg_textbox = gr.Textbox(label="Your Question", placeholder="Type your question here... (Shift+Enter for new line)", scale=4, container=False, elem_id="chat_input")
                             submit_button = gr.Button("Ask", variant="primary", scale=1, min_width=150, elem_id="submit_button")
@@ -126,7 +1258,7 @@ def build_interface():
 
             with gr.TabItem("🎙️ Mock Interview"):
                 gr.Markdown("## Practice Your Interview Skills")
-                interview_state = gr.State([])
+                interview_state = gr.State(None)
                 interview_role = gr.Dropdown(["Software Engineer", "Data Scientist", "Data Analyst", "Product Manager", "UX/UI Designer", "Marketing Manager", "Cybersecurity Analyst", "DevOps Engineer", "AI/ML Engineer"], label="Select a Job Role")
                 start_interview_btn = gr.Button("Start Interview", variant="primary")
                 interview_chatbot = gr.Chatbot(label="Interview Session", height=400)
@@ -180,40 +1312,57 @@ def build_interface():
                         gr.Markdown("### Your Personalized Suggestion")
                         quiz_output = gr.Markdown("Your results will appear here...")
 
+        @instrument
         def main_chat_respond(user_message, chat_history, api_key, uploaded_file, voice_file):
+            uploads = []
+            if uploaded_file: uploads.append(FILE_UPLOADS.submit(api_key, file_path(uploaded_file)))
+            if voice_file: uploads.append(FILE_UPLOADS.submit(api_key, voice_file))
+
             input_for_history = user_message if user_message else "[Voice Input]"
-            if uploaded_file: input_for_history += f"\n*[File: {os.path.basename(uploaded_file.name)}]*"
+            if uploaded_file: input_for_history += f"\n*[File: {os.path.basename(file_path(uploaded_file))}]*"
             chat_history.append((input_for_history, None))
-            yield "", chat_history, None, None, None
+            # audio_output streams: a None chunk ends the stream, so updates
+            # that carry no audio send an empty chunk instead.
+            yield "", chat_history, b"", None, None
 
             system_prompt = "You are 'VMPX', an expert AI Career Counselor..."
             user_parts = []
             if user_message: user_parts.append(user_message)
-            if uploaded_file: user_parts.append(genai.upload_file(path=uploaded_file.name))
-            if voice_file: user_parts.append(genai.upload_file(path=voice_file))
+            try:
+                user_parts += [upload.result() for upload in uploads]
+            except Exception as e:
+                chat_history[-1] = (chat_history[-1][0], f"File Upload Error: {e}")
+                yield "", chat_history, None, None, None
+                return
 
-            bot_response_text = get_gemini_response(api_key, system_prompt, user_parts)
-            chat_history[-1] = (chat_history[-1][0], bot_response_text)
-            audio_response_path = text_to_speech(bot_response_text)
-            yield "", chat_history, audio_response_path, None, None
+            bot_response_text = ""
+            speech = SpeechPipeline()
+            for bot_response_text in stream_gemini_response(api_key, system_prompt, user_parts, tab="chat"):
+                chat_history[-1] = (chat_history[-1][0], bot_response_text)
+                speech.feed(bot_response_text)
+                yield "", chat_history, speech.take_ready(), None, None
+            speech.finish(bot_response_text)
+            for audio in speech.drain():
+                yield "", chat_history, audio, None, None
 
         submit_button.click(main_chat_respond, [msg_textbox, chatbot, api_key_box, file_box, voice_input], [msg_textbox, chatbot, audio_output, file_box, voice_input])
         msg_textbox.submit(main_chat_respond, [msg_textbox, chatbot, api_key_box, file_box, voice_input], [msg_textbox, chatbot, audio_output, file_box, voice_input])
 
+        @instrument
         def clear_chat(): return [], None, random.choice(CAREER_TIPS)
         clear_chat_btn.click(clear_chat, outputs=[chatbot, audio_output, daily_tip])
 
+        @instrument
         def export_chat(chat_history):
-            history_str = "VMPX Chat History\n\n"
-            for turn in chat_history:
-                user = f"You: {turn[0]}\n" if turn[0] else ""
-                bot = f"NIRVANA: {turn[1]}\n\n" if turn[1] else ""
-                history_str += f"{user}{bot}"
-            filepath = f"/tmp/VMPX_chat_{uuid.uuid4()}.txt"
-            with open(filepath, "w") as f: f.write(history_str)
-            return gr.File(value=filepath, visible=True)
+            with ARTIFACTS.create("VMPX_chat", ".txt") as f:
+                f.write("VMPX Chat History\n\n")
+                for turn in chat_history:
+                    if turn[0]: f.write(f"You: {turn[0]}\n")
+                    if turn[1]: f.write(f"NIRVANA: {turn[1]}\n\n")
+            return gr.File(value=f.name, visible=True)
         export_chat_btn.click(export_chat, inputs=chatbot, outputs=download_file)
 
+        @instrument
         def generate_mind_map(topic, api_key):
             system_prompt = """
             You are a mind map generation expert. The user will provide a topic or text. Your task is to generate a structured mind map for it using Mermaid syntax. The mind map should be hierarchical, logical, and easy to read.
@@ -228,9 +1377,10 @@ def build_interface():
                 (Child 2)
             ```
             """
-            return get_gemini_response(api_key, system_prompt, [topic])
+            return get_gemini_response(api_key, system_prompt, [topic], tab="mind_map")
         generate_map_btn.click(generate_mind_map, [mind_map_input, api_key_box], mind_map_output)
 
+        @instrument
         def find_youtube_videos(topic, api_key):
             system_prompt = """
             You are a YouTube video search expert. A user will provide a topic. Find 5 relevant, high-quality, and popular tutorial or explanation videos for that topic on YouTube.
@@ -241,17 +1391,12 @@ def build_interface():
               {"title": "Learn Python - Full Course for Beginners [Tutorial]", "video_id": "rfscVS0vtbw"}
             ]
             """
-            response_text = get_gemini_response(api_key, system_prompt, [topic]).strip()
+            response_text = get_gemini_response(api_key, system_prompt, [topic], tab="learning_hub", validate=is_video_list)
             try:
-                if response_text.startswith("```json"):
-                    response_text = response_text[7:-3].strip()
-
-                videos = json.loads(response_text)
+                videos = parse_video_list(response_text)
 
                 markdown_output = "### Top 5 Video Recommendations:\n\n"
-                for i, video in enumerate(videos):
-                    title = video.get("title", "No Title")
-                    video_id = video.get("video_id", "")
+                for i, (title, video_id) in enumerate(videos):
                     if video_id and re.match(r'^[a-zA-Z0-9_-]{11}$', video_id):
                         markdown_output += f"{i+1}. [{title}](https://www.youtube.com/watch?v={video_id})\n"
                 return markdown_output
@@ -260,61 +1405,88 @@ def build_interface():
                 return "Sorry, I couldn't retrieve a valid list of videos for that topic. Please try again."
         find_video_btn.click(find_youtube_videos, [video_topic_input, api_key_box], video_recommendations_output)
 
+        @instrument
         def start_interview(role, api_key):
-            if not role: return "Please select a role first.", [], []
+            if not role: return [(None, "Please select a role first.")], None
             system_prompt = f"You are a hiring manager conducting a mock interview for a '{role}' position. Start the interview by greeting the candidate and asking the first behavioral or technical question. Be encouraging."
-            first_question = get_gemini_response(api_key, system_prompt)
-            interview_history = [ (None, first_question) ]
-            return interview_history, interview_history
+            first_question = get_gemini_response(api_key, system_prompt, tab="interview")
+            session = InterviewSession(role, first_question)
+            return session.display, session
         start_interview_btn.click(start_interview, inputs=[interview_role, api_key_box], outputs=[interview_chatbot, interview_state])
 
-        def continue_interview(answer, history, role, api_key):
-            history.append( (answer, None) )
-            system_prompt = f"You are a hiring manager continuing a mock interview for a '{role}' position. The candidate's previous answers are in the chat history. Ask the next logical question based on their last answer, or provide brief feedback and then ask the next question. Keep the interview flowing."
-            user_parts = [json.dumps(history)]
-            next_question = get_gemini_response(api_key, system_prompt, user_parts)
-            history[-1] = (answer, next_question)
-            return history, history, ""
-        submit_interview_answer_btn.click(continue_interview, [interview_answer, interview_state, interview_role, api_key_box], [interview_chatbot, interview_state, interview_answer])
+        @instrument
+        def continue_interview(answer, session, api_key):
+            if session is None: return [(None, "Please start the interview first.")], None, answer
+            session.answer(api_key, answer)
+            return session.display, session, ""
+        submit_interview_answer_btn.click(continue_interview, [interview_answer, interview_state, api_key_box], [interview_chatbot, interview_state, interview_answer])
 
+        @instrument
         def generate_cover_letter(job_desc, skills, api_key):
             system_prompt = "You are a professional cover letter writer..."
             user_parts = [f"Job Description:\n{job_desc}\n\nMy Skills/Experience:\n{skills}"]
-            return get_gemini_response(api_key, system_prompt, user_parts)
+            yield from stream_gemini_response(api_key, system_prompt, user_parts, tab="cover_letter")
         generate_letter_btn.click(generate_cover_letter, [job_desc, user_skills, api_key_box], cover_letter_output)
 
+        @instrument
         def optimize_linkedin(about_text, api_key):
             system_prompt = "You are a LinkedIn profile optimization expert..."
-            return get_gemini_response(api_key, system_prompt, [about_text])
+            yield from stream_gemini_response(api_key, system_prompt, [about_text], tab="linkedin")
         optimize_linkedin_btn.click(optimize_linkedin, [linkedin_about, api_key_box], linkedin_output)
 
+        @instrument
         def plan_goal(goal, api_key):
             system_prompt = "You are a career coach and productivity expert..."
-            return get_gemini_response(api_key, system_prompt, [goal])
+            yield from stream_gemini_response(api_key, system_prompt, [goal], tab="goal_planner")
         plan_goal_btn.click(plan_goal, [career_goal, api_key_box], goal_plan_output)
 
+        @instrument
         def analyze_resume(resume_file, api_key):
-            if not resume_file: return "Please upload a resume to analyze."
+            if not resume_file:
+                yield "Please upload a resume to analyze."
+                return
+            upload = FILE_UPLOADS.submit(api_key, file_path(resume_file))
             system_prompt = "You are a world-class career coach specializing in resume feedback..."
-            return get_gemini_response(api_key, system_prompt, [genai.upload_file(path=resume_file.name)])
+            try:
+                resume = upload.result()
+            except Exception as e:
+                yield f"File Upload Error: {e}"
+                return
+            yield from stream_gemini_response(api_key, system_prompt, [resume], tab="resume")
         analyze_resume_btn.click(analyze_resume, inputs=[resume_file_input, api_key_box], outputs=resume_output)
 
+        @instrument
         def analyze_gap(skills, role, api_key):
-            if not skills or not role: return "Please fill in both your current skills and desired role."
+            if not skills or not role:
+                yield "Please fill in both your current skills and desired role."
+                return
             system_prompt = "You are a career development expert..."
-            return get_gemini_response(api_key, system_prompt, [f"Current Skills: {skills}\nDesired Role: {role}"])
+            yield from stream_gemini_response(api_key, system_prompt, [f"Current Skills: {skills}\nDesired Role: {role}"], tab="skill_gap")
         analyze_gap_btn.click(analyze_gap, inputs=[current_skills, desired_role, api_key_box], outputs=skill_gap_output)
 
+        @instrument
         def run_quiz(q1, q2, q3, api_key):
             if not q1 or not q2 or not q3: return "Please answer all questions."
             dominant_trait = "analytical"
             quiz_prompt = f"A user's dominant personality trait is '{dominant_trait}'. Suggest 3-4 suitable career paths."
-            return get_gemini_response(api_key, quiz_prompt)
+            return get_gemini_response(api_key, quiz_prompt, tab="quiz")
         quiz_submit_btn.click(run_quiz, inputs=[q1, q2, q3, api_key_box], outputs=quiz_output)
 
     return demo
 
 if __name__ == "__main__":
+    start = time.perf_counter()
     chatbot_app = build_interface()
-    chatbot_app.queue()
-    chatbot_app.launch(server_name="0.0.0.0", share=True)
+    STARTUP_TIMINGS["build_interface"] = time.perf_counter() - start
+    # Let more Gradio workers run than Gemini slots so cached tabs, uploads and TTS
+    # are not stuck behind slow upstream calls; REQUEST_ENGINE does the limiting.
+    chatbot_app.queue(default_concurrency_limit=MAX_CONCURRENCY * 2, max_size=MAX_QUEUED_REQUESTS)
+    start = time.perf_counter()
+    chatbot_app.launch(server_name="0.0.0.0", share=True, prevent_thread_lock=True)
+    mount_metrics(chatbot_app.app)
+    STARTUP_TIMINGS["launch"] = time.perf_counter() - start
+    STARTUP_TIMINGS["total until ready"] = time.perf_counter() - STARTUP_STARTED
+    print(startup_report())
+    if WARM_UP:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    chatbot_app.block_thread()
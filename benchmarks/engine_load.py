@@ -0,0 +1,66 @@
+# Load test for RequestEngine against the fake Gemini client from fakes.py,
+# which injects latency, 429s and 5xx errors.
+#
+#   python benchmarks/engine_load.py --requests 500 --concurrency 64 --error-rate 0.1
+import argparse
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import fakes
+from fakes import app
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[int(fraction * (len(values) - 1))] if values else 0.0
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64, help="simultaneous callers, like Gradio workers")
+    parser.add_argument("--keys", type=int, default=4, help="distinct API keys")
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--error-codes", type=int, nargs="+", default=[429, 429, 503, 500], help="injected status codes, picked uniformly")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    fakes.install(fakes.FakeSettings(first_token_ms=args.latency_ms, ms_per_token=0, tokens=20,
+                                     failure_rate=args.error_rate, failure_codes=args.error_codes))
+    app.RESPONSE_CACHE.enabled = False
+
+    def one(i):
+        start = time.perf_counter()
+        api_key = f"key-{i % args.keys}"
+        if args.stream:
+            text = list(app.stream_gemini_response(api_key, "system", [f"request {i}"]))[-1]
+        else:
+            text = app.get_gemini_response(api_key, "system", [f"request {i}"])
+        return time.perf_counter() - start, "ok" if text.startswith("This is simulated") else text[:60]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [seconds for seconds, outcome in results if outcome == "ok"]
+    report = {
+        "requests": args.requests,
+        "seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "outcomes": dict(Counter(outcome for _, outcome in results)),
+        "upstream_calls": fakes.FakeGeminiClient.calls,
+        "engine": app.REQUEST_ENGINE.snapshot(),
+    }
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# Local stand-ins for the Gemini SDK and gTTS so benchmarks run without an API
+# key or network. install() swaps them into app; every delay is configurable.
+import os
+import random
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+VIDEO_LIST = '[{"title": "Python for Beginners - Full Course", "video_id": "eWRfhZ_sgpM"}, {"title": "Learn Python - Full Course for Beginners [Tutorial]", "video_id": "rfscVS0vtbw"}]'
+
+class FakeSettings:
+    def __init__(self, first_token_ms=300, ms_per_token=10, tokens=200, tokens_per_chunk=8,
+                 failure_rate=0.0, failure_codes=(429, 503), upload_ms=150, tts_ms_per_char=0.5, ms_per_1k_prompt_tokens=20):
+        self.first_token_ms = first_token_ms
+        self.ms_per_token = ms_per_token
+        self.tokens = tokens
+        self.tokens_per_chunk = tokens_per_chunk
+        self.failure_rate = failure_rate
+        self.failure_codes = failure_codes
+        self.upload_ms = upload_ms
+        self.tts_ms_per_char = tts_ms_per_char
+        self.ms_per_1k_prompt_tokens = ms_per_1k_prompt_tokens
+
+class FakeApiError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code} (injected)")
+        self.code = code
+
+class FakeUsage:
+    def __init__(self, prompt_tokens, output_tokens):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+
+class FakeResponse:
+    def __init__(self, text, usage=None):
+        self.text = text
+        self.usage_metadata = usage
+
+class FakeFile:
+    def __init__(self, path):
+        self.name = f"files/{os.path.basename(path)}"
+        self.uri = f"https://fake.local/{self.name}"
+
+class FakeChat:
+    def __init__(self, client, history):
+        self.client = client
+        self.history = history or []
+
+    def send_message(self, content, stream=False):
+        prompt = [part for turn in self.history for part in turn["parts"]] + [content]
+        return self.client.generate_content(prompt, stream=stream)
+
+class FakeGeminiClient:
+    # Mirrors the GeminiClient surface used by app: generate_content (optionally
+    # streaming), start_chat and upload_file.
+    calls = 0
+    _lock = threading.Lock()
+
+    def __init__(self, api_key, settings):
+        self.api_key = api_key
+        self.settings = settings
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        with FakeGeminiClient._lock:
+            FakeGeminiClient.calls += 1
+        settings = self.settings
+        prompt_tokens = sum(app.estimate_tokens(part) for part in contents if isinstance(part, str))
+        time.sleep((settings.first_token_ms + settings.ms_per_1k_prompt_tokens * prompt_tokens / 1000) / 1000)
+        if random.random() < settings.failure_rate:
+            raise FakeApiError(random.choice(settings.failure_codes))
+        text = self._reply(contents)
+        words = text.split(" ")
+        usage = FakeUsage(prompt_tokens, len(words))
+        if not stream:
+            time.sleep(settings.ms_per_token * len(words) / 1000)
+            return FakeResponse(text, usage)
+
+        def chunks():
+            for i in range(0, len(words), settings.tokens_per_chunk):
+                if i:
+                    time.sleep(settings.ms_per_token * settings.tokens_per_chunk / 1000)
+                piece = " ".join(words[i:i + settings.tokens_per_chunk])
+                yield FakeResponse(piece if i == 0 else " " + piece, usage)
+        return chunks()
+
+    def _reply(self, contents):
+        if isinstance(contents[0], str) and "video_id" in contents[0]:
+            return VIDEO_LIST
+        sentences = []
+        for i in range(max(1, self.settings.tokens // 10)):
+            sentences.append(f"This is simulated sentence number {i + 1} of the reply text.")
+        return " ".join(sentences)
+
+    def start_chat(self, history=None):
+        return FakeChat(self, history)
+
+    def upload_file(self, path, mime_type=None):
+        time.sleep(self.settings.upload_ms / 1000)
+        return FakeFile(path)
+
+class FakeTTS:
+    # Same constructor and write_to_fp as gtts.gTTS.
+    settings = FakeSettings()
+
+    def __init__(self, text, **kwargs):
+        self.text = text
+
+    def write_to_fp(self, fp):
+        time.sleep(self.settings.tts_ms_per_char * len(self.text) / 1000)
+        fp.write(b"\xff\xfb\x90\x00" * max(1, len(self.text)))
+
+def install(settings=None):
+    settings = settings or FakeSettings()
+    app.GEMINI_CLIENTS = app.GeminiClientPool(factory=lambda api_key: FakeGeminiClient(api_key, settings))
+    app.FILE_UPLOADS.clients = app.GEMINI_CLIENTS
+    FakeTTS.settings = settings
+    app.gtts = SimpleNamespace(gTTS=FakeTTS)
+    return settings
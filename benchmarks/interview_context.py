@@ -0,0 +1,59 @@
+# Compares per-turn prompt size and latency of the mock interview over a long
+# session: the old "json.dumps(history)" prompt vs InterviewSession.
+#
+#   python benchmarks/interview_context.py --turns 30
+import argparse
+import json
+import time
+
+import fakes
+from fakes import app
+
+ANSWER = "In my last role I owned the data pipeline end to end. I rewrote the nightly batch jobs as incremental loads, which cut the runtime from four hours to twenty minutes, and I set up alerting so failures were caught before the morning reports."
+QUESTION = "Thanks, that is a solid example. How did you decide which jobs to migrate first, and how did you convince the team that the rewrite was worth the risk?"
+
+def run_legacy(model, turns):
+    history = [(None, QUESTION)]
+    rows = []
+    for turn in range(1, turns + 1):
+        history.append((ANSWER, None))
+        prompt = ["You are a hiring manager continuing a mock interview...", json.dumps(history)]
+        start = time.perf_counter()
+        model.generate_content(prompt)
+        history[-1] = (ANSWER, QUESTION)
+        rows.append({"turn": turn, "prompt_tokens": sum(app.estimate_tokens(part) for part in prompt), "seconds": time.perf_counter() - start})
+    return rows
+
+def run_session(turns):
+    session = app.InterviewSession("Data Engineer", QUESTION)
+    for turn in range(1, turns + 1):
+        start = time.perf_counter()
+        session.answer("benchmark-key", ANSWER)
+        session.stats[-1]["seconds"] = time.perf_counter() - start
+        session.stats[-1]["turn"] = turn
+    return session.stats
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--base-ms", type=float, default=20)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=40)
+    parser.add_argument("--reply-tokens", type=int, default=30)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    # Latency grows with prompt size, like the real API.
+    settings = fakes.install(fakes.FakeSettings(first_token_ms=args.base_ms, ms_per_token=0, tokens=args.reply_tokens,
+                                                ms_per_1k_prompt_tokens=args.ms_per_1k_tokens))
+    legacy = run_legacy(fakes.FakeGeminiClient("benchmark-key", settings), args.turns)
+    session = run_session(args.turns)
+
+    print(f"{'turn':>4} {'legacy tokens':>14} {'legacy ms':>10} {'session tokens':>15} {'session ms':>11}")
+    for old, new in zip(legacy, session):
+        print(f"{old['turn']:>4} {old['prompt_tokens']:>14} {old['seconds'] * 1000:>10.1f} {new['prompt_tokens']:>15} {new['seconds'] * 1000:>11.1f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"legacy": legacy, "session": session}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+# Offline benchmark for every tab handler, using the fakes in fakes.py.
+#
+#   python benchmarks/run.py --mode direct --concurrency 1 8 32 --requests 64
+#   python benchmarks/run.py --mode queue --handlers main_chat_respond run_quiz
+#   python benchmarks/run.py --repeat-inputs --output results.json
+#
+# "direct" calls the handler functions in-process; "queue" launches the app on
+# localhost and drives it through gradio_client, so requests also pass through
+# the Gradio queue. Results are printed and written as JSON for comparison.
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import fakes
+from fakes import app
+
+ROLE = "Software Engineer"
+REQUEST_IDS = itertools.count()
+
+def make_inputs(name, i, repeat, resume_path):
+    topic = "Introduction to Python" if repeat else f"Introduction to Python, part {i}"
+    key = "bench-key"
+    return {
+        "main_chat_respond": [f"How do I get started with {topic}?", [], key, None, None],
+        "clear_chat": [],
+        "export_chat": [[["Hi", "Hello!"], [f"Tell me about {topic}", "Sure. " * 50]]],
+        "generate_mind_map": [topic, key],
+        "find_youtube_videos": [topic, key],
+        "start_interview": [ROLE, key],
+        "continue_interview": ["I led the migration of our billing service. " * 3, None, key],
+        "generate_cover_letter": [f"Backend engineer working on {topic}", "3 years of Python", key],
+        "optimize_linkedin": [f"I am an engineer interested in {topic}.", key],
+        "plan_goal": [f"Become a senior engineer focused on {topic}", key],
+        "analyze_resume": [resume_path, key],
+        "analyze_gap": ["Python, SQL", f"Data Scientist ({topic})" if not repeat else "Data Scientist", key],
+        "run_quiz": ["Solving complex puzzles", "Working with data and numbers", "A clear, logical problem", key],
+    }[name]
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[int(fraction * (len(values) - 1))] if values else None
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+def handler_functions(demo):
+    # Handlers bound to more than one event (e.g. Ask button and Enter) appear once.
+    fns = getattr(demo, "fns", [])
+    fns = fns.values() if isinstance(fns, dict) else fns
+    return {block_fn.name: block_fn.fn for block_fn in fns}
+
+def call_direct(fn, args):
+    # Returns (time to first output, total time, output). For the chat tab the
+    # first output is the echoed question; see the "ttft" stage for model latency.
+    start = time.perf_counter()
+    first = None
+    result = fn(*args)
+    if hasattr(result, "__next__"):
+        output = None
+        for output in result:
+            if first is None:
+                first = time.perf_counter() - start
+        result = output
+    total = time.perf_counter() - start
+    return first if first is not None else total, total, result
+
+def prepare_direct(name, args, fns):
+    if name == "continue_interview":
+        _, session = fns["start_interview"](ROLE, args[-1])
+        args = [args[0], session] + args[2:]
+    if name == "analyze_resume":
+        args = [SimpleNamespace(name=args[0])] + args[1:]
+    return args
+
+class QueueDriver:
+    # Runs the app on a free localhost port; one gradio_client per worker so that
+    # gr.State (the interview session) is kept per simulated user.
+    def __init__(self, demo, concurrency):
+        from gradio_client import Client, handle_file
+        self.handle_file = handle_file
+        demo.queue(default_concurrency_limit=app.MAX_CONCURRENCY * 2, max_size=max(app.MAX_QUEUED_REQUESTS, concurrency * 2))
+        _, self.url, _ = demo.launch(server_name="127.0.0.1", prevent_thread_lock=True, share=False, quiet=True)
+        self.demo = demo
+        self.local = threading.local()
+        self.Client = Client
+
+    def client(self):
+        if not hasattr(self.local, "client"):
+            self.local.client = self.Client(self.url, verbose=False, download_files=False)
+        return self.local.client
+
+    def call(self, name, args):
+        client = self.client()
+        if name == "continue_interview":
+            client.predict(ROLE, args[-1], api_name="/start_interview")
+            args = [args[0], args[2]]
+        if name == "analyze_resume":
+            args = [self.handle_file(args[0])] + args[1:]
+        if name == "main_chat_respond":
+            args = [args[0], args[1], args[2], None, None]
+        start = time.perf_counter()
+        job = client.submit(*args, api_name=f"/{name}")
+        first = None
+        while not job.done():
+            if first is None and job.outputs():
+                first = time.perf_counter() - start
+            time.sleep(0.002)
+        result = job.result()
+        total = time.perf_counter() - start
+        return first if first is not None else total, total, result
+
+    def close(self):
+        self.demo.close()
+
+def run_case(name, concurrency, requests, call, repeat, resume_path):
+    errors = 0
+    lock = threading.Lock()
+    results = []
+
+    def one(i):
+        nonlocal errors
+        try:
+            first, total, output = call(name, make_inputs(name, next(REQUEST_IDS), repeat, resume_path))
+        except Exception:
+            with lock:
+                errors += 1
+            return None
+        text = json.dumps(output, default=str)
+        if "error occurred" in text or "Please try again" in text:
+            with lock:
+                errors += 1
+        return first, total
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = [r for r in pool.map(one, range(requests)) if r]
+    elapsed = time.perf_counter() - start
+    firsts = [first for first, _ in results]
+    totals = [total for _, total in results]
+    return {
+        "handler": name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput_rps": len(totals) / elapsed if elapsed else 0.0,
+        "first_output": {"p50": percentile(firsts, 0.5), "p95": percentile(firsts, 0.95), "p99": percentile(firsts, 0.99)},
+        "latency": {"p50": percentile(totals, 0.5), "p95": percentile(totals, 0.95), "p99": percentile(totals, 0.99)},
+        "rss_mb": rss_mb(),
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["direct", "queue", "both"], default="direct")
+    parser.add_argument("--handlers", nargs="*", help="defaults to every handler in build_interface")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=32, help="requests per handler and concurrency level")
+    parser.add_argument("--repeat-inputs", action="store_true", help="send identical inputs to exercise caching and coalescing")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--ms-per-token", type=float, default=10)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--upload-ms", type=float, default=150)
+    parser.add_argument("--tts-ms-per-char", type=float, default=0.5)
+    parser.add_argument("--tracemalloc", action="store_true", help="also report peak Python heap (slower)")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    settings = fakes.install(fakes.FakeSettings(
+        first_token_ms=args.first_token_ms, ms_per_token=args.ms_per_token, tokens=args.tokens,
+        failure_rate=args.failure_rate, upload_ms=args.upload_ms, tts_ms_per_char=args.tts_ms_per_char,
+    ))
+    app.RESPONSE_CACHE.enabled = not args.no_cache
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    demo = app.build_interface()
+    fns = handler_functions(demo)
+    names = args.handlers or list(fns)
+    resume = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    resume.write(b"%PDF-1.4 benchmark resume\n" * 2000)
+    resume.close()
+
+    modes = ["direct", "queue"] if args.mode == "both" else [args.mode]
+    results = []
+    for mode in modes:
+        if mode == "direct":
+            call = lambda name, inputs: call_direct(fns[name], prepare_direct(name, inputs, fns))
+            driver = None
+        else:
+            driver = QueueDriver(demo, max(args.concurrency))
+            call = driver.call
+        try:
+            for concurrency in args.concurrency:
+                for name in names:
+                    result = run_case(name, concurrency, args.requests, call, args.repeat_inputs, resume.name)
+                    result["mode"] = mode
+                    if args.tracemalloc:
+                        result["heap_peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                        tracemalloc.reset_peak()
+                    results.append(result)
+                    print(f"{mode:6} c={concurrency:<3} {name:22} p50={result['latency']['p50'] or 0:.3f}s p95={result['latency']['p95'] or 0:.3f}s "
+                          f"p99={result['latency']['p99'] or 0:.3f}s first p50={result['first_output']['p50'] or 0:.3f}s "
+                          f"{result['throughput_rps']:.1f} req/s errors={result['errors']} rss={result['rss_mb']:.0f}MB")
+        finally:
+            if driver:
+                driver.close()
+    os.unlink(resume.name)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "settings": vars(settings),
+        "options": {k: v for k, v in vars(args).items() if k != "output"},
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "upstream_calls": fakes.FakeGeminiClient.calls,
+        "components": {
+            "client_pool": app.GEMINI_CLIENTS.snapshot(),
+            "response_cache": app.RESPONSE_CACHE.snapshot(),
+            "uploads": app.FILE_UPLOADS.snapshot(),
+            "engine": app.REQUEST_ENGINE.snapshot(),
+            "coalescing": app.IN_FLIGHT.snapshot(),
+            "artifacts": app.ARTIFACTS.snapshot(),
+        },
+        "stages": {stage: histogram.summary() for stage, histogram in app.STAGE_HISTOGRAMS.items()},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import fakes
+
+@pytest.fixture
+def settings():
+    # Fast fakes; tests that need failures or slow chunks adjust the returned settings.
+    return fakes.install(fakes.FakeSettings(first_token_ms=5, ms_per_token=0.5, tokens=40, upload_ms=5, tts_ms_per_char=0.05))
@@ -0,0 +1,19 @@
+import os
+
+from fakes import app
+
+def test_gradio_cache_ages_out_with_artifacts(settings):
+    demo = app.build_interface()
+    frequency, age = demo.delete_cache
+    assert age == int(app.ARTIFACT_MAX_AGE_SECONDS)
+    assert 0 < frequency <= age
+
+def test_store_evicts_least_recently_used(tmp_path):
+    store = app.ArtifactStore(directory=str(tmp_path), max_bytes=10)
+    store.write("a", ".mp3", b"12345")
+    store.write("b", ".mp3", b"12345")
+    assert store.read("a", ".mp3") == b"12345"
+    store.write("c", ".mp3", b"12345")
+    store.evict()
+    assert sorted(os.listdir(tmp_path)) == ["a.mp3", "c.mp3"]
+    assert store.read("b", ".mp3") is None
@@ -0,0 +1,23 @@
+import httpx
+import pytest
+from gradio_client import Client
+
+from fakes import app
+
+@pytest.fixture
+def server(settings):
+    demo = app.build_interface()
+    demo.queue()
+    _, url, _ = demo.launch(server_name="127.0.0.1", prevent_thread_lock=True, quiet=True)
+    yield url
+    demo.close()
+
+def test_chat_audio_stream_returns_mp3(server):
+    client = Client(server, verbose=False, download_files=False)
+    job = client.submit("How do I become a data engineer?", [], "test-key", None, None, api_name="/main_chat_respond")
+    audio = job.result()[2]
+    assert audio["is_stream"]
+
+    response = httpx.get(audio["url"], timeout=30)
+    assert response.status_code == 200
+    assert response.content.startswith(b"\xff\xfb")
@@ -0,0 +1,85 @@
+import hashlib
+import threading
+import time
+
+import pytest
+
+import fakes
+from fakes import app
+
+@pytest.fixture
+def built():
+    return []
+
+@pytest.fixture
+def pool(settings, built):
+    def factory(api_key):
+        built.append(api_key)
+        return fakes.FakeGeminiClient(api_key, settings)
+    return app.GeminiClientPool(factory=factory, max_size=2, idle_ttl=60)
+
+def test_clients_are_reused_per_key(pool, built):
+    first = pool.get("key-a")
+    assert pool.get("key-a") is first
+    assert pool.get("key-b") is not first
+    assert built == ["key-a", "key-b"]
+    stats = pool.snapshot()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 2)
+    assert stats["setup_seconds"] >= 0
+
+def test_least_recently_used_client_is_evicted(pool, built):
+    pool.get("key-a")
+    pool.get("key-b")
+    pool.get("key-a")
+    pool.get("key-c")
+    assert pool.snapshot()["evictions"] == 1
+    pool.get("key-a")
+    pool.get("key-b")
+    assert built == ["key-a", "key-b", "key-c", "key-b"]
+
+def test_idle_clients_are_evicted(pool, built):
+    pool.idle_ttl = 0.05
+    pool.get("key-a")
+    time.sleep(0.1)
+    pool.get("key-b")
+    stats = pool.snapshot()
+    assert (stats["evictions"], stats["size"]) == (1, 1)
+    pool.get("key-a")
+    assert built == ["key-a", "key-b", "key-a"]
+
+def test_concurrent_builds_keep_one_client(settings):
+    started = threading.Barrier(2)
+
+    def slow_factory(api_key):
+        started.wait()
+        return fakes.FakeGeminiClient(api_key, settings)
+    pool = app.GeminiClientPool(factory=slow_factory)
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(pool.get("key-a"))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert clients[0] is clients[1]
+    assert pool.snapshot()["size"] == 1
+
+def test_losing_build_refreshes_lru_position(settings):
+    # The "built first" branch must move the key to the end, or the oldest-first
+    # idle scan stops at it and leaves older idle clients behind.
+    build_b = threading.Event()
+    b_started = threading.Event()
+
+    def factory(api_key):
+        if api_key == "key-b" and not b_started.is_set():
+            b_started.set()
+            build_b.wait()
+        return fakes.FakeGeminiClient(api_key, settings)
+    pool = app.GeminiClientPool(factory=factory, idle_ttl=60)
+    slow = threading.Thread(target=pool.get, args=("key-b",))
+    slow.start()
+    b_started.wait()
+    pool.get("key-b")
+    pool.get("key-a")
+    build_b.set()
+    slow.join()
+    assert list(pool._clients) == [hashlib.sha256(key.encode()).hexdigest() for key in ("key-a", "key-b")]
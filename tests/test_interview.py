@@ -0,0 +1,45 @@
+import pytest
+
+import fakes
+from fakes import app
+
+ANSWER = "In my last role I owned the data pipeline end to end and rewrote the nightly batch jobs as incremental loads."
+QUESTION = "How did you decide which jobs to migrate first?"
+
+@pytest.fixture
+def session(settings):
+    settings.tokens = 30
+    return app.InterviewSession("Data Engineer", QUESTION, window_turns=4, summary_every=2, token_budget=800)
+
+def test_prompt_stays_bounded_over_a_long_interview(session):
+    for _ in range(30):
+        session.answer("test-key", ANSWER)
+        assert len(session.turns) <= session.window_turns + session.summary_every
+    assert len(session.stats) == 30
+    assert all(stat["prompt_tokens"] <= session.token_budget for stat in session.stats)
+    assert session.summary
+    assert len(session.summary) <= session.token_budget * 2
+
+def test_tight_budget_shrinks_the_window(session):
+    session.token_budget = 300
+    for _ in range(30):
+        session.answer("test-key", ANSWER)
+    assert all(stat["prompt_tokens"] <= session.token_budget for stat in session.stats)
+    assert len(session.turns) < session.window_turns
+
+def test_failed_summary_falls_back_to_transcript(session, monkeypatch):
+    generate = fakes.FakeGeminiClient.generate_content
+
+    def flaky(self, contents, stream=False, **kwargs):
+        if contents[0].startswith("You keep running notes"):
+            raise fakes.FakeApiError(400)
+        return generate(self, contents, stream=stream, **kwargs)
+    monkeypatch.setattr(fakes.FakeGeminiClient, "generate_content", flaky)
+
+    for _ in range(12):
+        session.answer("test-key", ANSWER)
+    assert len(session.display) == 13
+    assert "error" not in session.display[-1][1].lower()
+    assert "Candidate: " + ANSWER in session.summary
+    assert len(session.summary) <= session.token_budget * 2
+    assert len(session.turns) <= session.window_turns + session.summary_every
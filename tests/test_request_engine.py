@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+import fakes
+from fakes import app
+
+def make_engine(**kwargs):
+    options = dict(max_concurrency=4, per_key_concurrency=2, max_queue=8, deadline=2, backoff_base=0.01, backoff_cap=0.05)
+    options.update(kwargs)
+    return app.RequestEngine(**options)
+
+def wait_until(condition, timeout=5):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out waiting for condition"
+        time.sleep(0.01)
+
+def fake_stream(settings, api_key="test-key"):
+    client = fakes.FakeGeminiClient(api_key, settings)
+    return lambda: client.generate_content(["Tell me about interviews."], stream=True)
+
+def test_stream_yields_every_chunk(settings):
+    engine = make_engine()
+    chunks = list(engine.stream("test-key", fake_stream(settings)))
+    assert "".join(chunk.text for chunk in chunks).startswith("This is simulated sentence number 1")
+    assert engine.stats["completed"] == 1
+    assert engine._key_slots == {}
+
+def test_full_queue_raises_engine_busy():
+    engine = make_engine(max_concurrency=1, per_key_concurrency=1, max_queue=1)
+    release = threading.Event()
+    holder = threading.Thread(target=engine.run, args=("test-key", release.wait))
+    waiter = threading.Thread(target=engine.run, args=("test-key", lambda: None))
+    holder.start()
+    wait_until(lambda: engine._key_slots)
+    waiter.start()
+    wait_until(lambda: engine._waiting == 1)
+    with pytest.raises(app.EngineBusy):
+        engine.run("test-key", lambda: None)
+    release.set()
+    holder.join()
+    waiter.join()
+    assert engine.stats["rejected"] == 1
+    assert engine.stats["completed"] == 2
+
+def test_rate_limit_is_retried():
+    engine = make_engine()
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise fakes.FakeApiError(429)
+        return "ok"
+    assert engine.run("test-key", flaky) == "ok"
+    assert len(attempts) == 3
+    assert engine.stats["retries"] == 2
+
+def test_client_errors_are_not_retried():
+    engine = make_engine()
+    attempts = []
+
+    def invalid():
+        attempts.append(1)
+        raise fakes.FakeApiError(400)
+    with pytest.raises(fakes.FakeApiError):
+        engine.run("test-key", invalid)
+    assert len(attempts) == 1
+    assert engine.stats["failed"] == 1
+
+def test_closed_stream_releases_slot(settings):
+    engine = make_engine()
+    stream = engine.stream("test-key", fake_stream(settings))
+    next(stream)
+    stream.close()
+    wait_until(lambda: engine._key_slots == {})
+
+def test_abandoned_streams_release_slots_at_deadline(settings):
+    # A cancelled Gradio event leaves the handler generator suspended without
+    # closing it; the pump must still give the slot back once the deadline passes.
+    settings.tokens = 400
+    settings.tokens_per_chunk = 1
+    engine = make_engine(per_key_concurrency=2, deadline=0.5, stream_buffer=2)
+    abandoned = [engine.stream("test-key", fake_stream(settings)) for _ in range(2)]
+    for stream in abandoned:
+        next(stream)
+    wait_until(lambda: engine._key_slots == {})
+    assert engine.stats["timeouts"] == 2
+
+    settings.tokens = 20
+    assert list(engine.stream("test-key", fake_stream(settings)))
+    assert engine.run("test-key", lambda: "ok") == "ok"
+
+def test_deployment_key_is_only_bound_by_the_global_limit():
+    # Every user shares the deployment key, so it must not be capped per key.
+    engine = make_engine(max_concurrency=8, per_key_concurrency=2, deployment_key="deploy-key")
+    threads = [threading.Thread(target=engine.run, args=("deploy-key", lambda: time.sleep(0.2))) for _ in range(8)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.perf_counter() - start < 0.35
+    assert engine.stats["completed"] == 8
+
+def test_pasted_keys_keep_the_per_key_limit():
+    engine = make_engine(max_concurrency=8, per_key_concurrency=2, deployment_key="deploy-key")
+    threads = [threading.Thread(target=engine.run, args=("user-key", lambda: time.sleep(0.2))) for _ in range(4)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.perf_counter() - start >= 0.4
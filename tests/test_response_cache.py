@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+import fakes
+from fakes import app
+
+VIDEO_PROMPT = 'Return a JSON list of {"title", "video_id"} objects.'
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = app.ResponseCache(tabs={"learning_hub"})
+    monkeypatch.setattr(app, "RESPONSE_CACHE", cache)
+    return cache
+
+def test_get_and_set(cache):
+    assert cache.get("learning_hub", "k") is None
+    cache.set("k", "value")
+    assert cache.get("learning_hub", "k") == "value"
+    assert cache.snapshot()["learning_hub"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+def test_entries_expire(cache):
+    cache.ttl = 0.05
+    cache.set("k", "value")
+    time.sleep(0.1)
+    assert cache.get("learning_hub", "k") is None
+
+def test_lru_bound(cache):
+    cache.max_entries = 2
+    for key in "abc":
+        cache.set(key, key)
+    assert cache.get("learning_hub", "a") is None
+    assert cache.get("learning_hub", "c") == "c"
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    app.ResponseCache(db_path=db_path).set("k", "value")
+    assert app.ResponseCache(db_path=db_path).get("learning_hub", "k") == "value"
+
+def test_only_listed_tabs_are_cached(cache):
+    assert cache.enabled_for("learning_hub")
+    assert not cache.enabled_for("chat")
+    cache.enabled = False
+    assert not cache.enabled_for("learning_hub")
+
+def test_valid_reply_is_cached(settings, cache):
+    first = app.get_gemini_response("test-key", VIDEO_PROMPT, ["Rust"], tab="learning_hub", validate=app.is_video_list)
+    calls = fakes.FakeGeminiClient.calls
+    assert app.get_gemini_response("test-key", VIDEO_PROMPT, ["Rust"], tab="learning_hub", validate=app.is_video_list) == first
+    assert fakes.FakeGeminiClient.calls == calls
+
+def test_invalid_reply_is_not_cached(settings, cache, monkeypatch):
+    monkeypatch.setattr(fakes.FakeGeminiClient, "_reply", lambda self, contents: "Sorry, here are some videos: ...")
+    app.get_gemini_response("test-key", VIDEO_PROMPT, ["Go"], tab="learning_hub", validate=app.is_video_list)
+    calls = fakes.FakeGeminiClient.calls
+    app.get_gemini_response("test-key", VIDEO_PROMPT, ["Go"], tab="learning_hub", validate=app.is_video_list)
+    assert fakes.FakeGeminiClient.calls == calls + 1
+
+def test_is_video_list():
+    assert app.is_video_list(fakes.VIDEO_LIST)
+    assert app.is_video_list(f"```json\n{fakes.VIDEO_LIST}\n```")
+    assert not app.is_video_list("Sorry, I can't help with that.")
+    assert not app.is_video_list('{"title": "Not a list"}')
+
+def test_free_text_is_case_sensitive(settings, monkeypatch):
+    monkeypatch.setattr(app, "RESPONSE_CACHE", app.ResponseCache(tabs={"linkedin"}))
+    prompt = "You are a LinkedIn profile optimization expert..."
+    list(app.stream_gemini_response("test-key", prompt, ["I write python   services."], tab="linkedin"))
+    calls = fakes.FakeGeminiClient.calls
+    list(app.stream_gemini_response("test-key", prompt, ["I write python services."], tab="linkedin"))
+    assert fakes.FakeGeminiClient.calls == calls
+    list(app.stream_gemini_response("test-key", prompt, ["I write Python services."], tab="linkedin"))
+    assert fakes.FakeGeminiClient.calls == calls + 1
+
+def test_topic_tabs_ignore_case():
+    assert app.prompt_fingerprint("p", ["Rust"], casefold=True) == app.prompt_fingerprint("p", [" rust "], casefold=True)
+    assert app.prompt_fingerprint("p", ["Rust"]) != app.prompt_fingerprint("p", ["rust"])
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+import fakes
+from fakes import app
+
+PROMPT = "You are a career coach and productivity expert..."
+
+@pytest.fixture
+def flights(settings, monkeypatch):
+    settings.tokens = 200
+    settings.ms_per_token = 2
+    flights = app.SingleFlight()
+    monkeypatch.setattr(app, "IN_FLIGHT", flights)
+    monkeypatch.setattr(app, "RESPONSE_CACHE", app.ResponseCache(tabs=()))
+    return flights
+
+def landed(flights, timeout=5):
+    # The pump lands the flight just after followers see it finish.
+    end = time.monotonic() + timeout
+    while flights.snapshot()["in_flight"] and time.monotonic() < end:
+        time.sleep(0.01)
+    return flights.snapshot()["in_flight"] == 0
+
+def stream(api_key, goal="Become a staff engineer"):
+    return app.stream_gemini_response(api_key, PROMPT, [goal], tab="goal_planner")
+
+def test_identical_requests_share_one_call(flights):
+    calls = fakes.FakeGeminiClient.calls
+    first, second = stream("test-key"), stream("test-key")
+    next(first), next(second)
+    assert list(first)[-1] == list(second)[-1]
+    assert fakes.FakeGeminiClient.calls == calls + 1
+    assert landed(flights)
+    assert flights.snapshot()["coalesced"] == 1
+
+def test_cancelled_leader_does_not_stall_followers(flights):
+    calls = fakes.FakeGeminiClient.calls
+    leader = stream("test-key")
+    partial = next(leader)
+    follower = stream("test-key")
+    next(follower)
+    leader.close()
+
+    texts = list(follower)
+    assert len(texts[-1]) > len(partial)
+    assert texts[-1].endswith("of the reply text.")
+    assert "error" not in texts[-1].lower()
+    assert fakes.FakeGeminiClient.calls == calls + 1
+
+def test_requests_on_different_keys_are_not_coalesced(flights):
+    calls = fakes.FakeGeminiClient.calls
+    results = {}
+
+    def run(api_key):
+        results[api_key] = list(stream(api_key))[-1]
+    threads = [threading.Thread(target=run, args=(api_key,)) for api_key in ("key-a", "key-b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results["key-a"] == results["key-b"]
+    assert fakes.FakeGeminiClient.calls == calls + 2
+    assert flights.snapshot()["coalesced"] == 0
+
+def test_failed_call_reaches_every_follower(flights, monkeypatch):
+    def fail(self, contents, stream=False, **kwargs):
+        raise fakes.FakeApiError(400)
+    monkeypatch.setattr(fakes.FakeGeminiClient, "generate_content", fail)
+    assert "An error occurred" in list(stream("bad-key"))[-1]
+    assert landed(flights)
+
+def test_followers_give_up_at_the_deadline():
+    flight = app.Flight("key")
+    flight.publish("partial")
+    follower = flight.follow(timeout=0.05)
+    assert next(follower) == "partial"
+    with pytest.raises(app.RequestTimeout):
+        next(follower)
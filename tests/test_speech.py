@@ -0,0 +1,38 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fakes import app
+
+SENTENCE = "This sentence is long enough to be spoken on its own."
+
+def test_audio_is_returned_in_order():
+    executor = ThreadPoolExecutor(max_workers=4)
+    speech = app.SpeechPipeline(synthesize=lambda text: text.encode(), executor=executor)
+    text = " ".join(f"Sentence number {i} is long enough to speak." for i in range(6))
+    speech.feed(text)
+    speech.finish(text)
+    audio = b"".join(speech.drain())
+    assert audio.decode() == text.replace(". ", ".")
+
+def test_new_session_is_not_queued_behind_earlier_replies():
+    executor = ThreadPoolExecutor(max_workers=2)
+    done = []
+    lock = threading.Lock()
+
+    def synthesize(text):
+        time.sleep(0.05)
+        with lock:
+            done.append(text)
+        return text.encode()
+
+    busy = app.SpeechPipeline(synthesize=synthesize, executor=executor)
+    reply = " ".join(f"Earlier reply sentence {i} is long enough." for i in range(20))
+    busy.feed(reply)
+    busy.finish(reply)
+    fresh = app.SpeechPipeline(synthesize=synthesize, executor=executor)
+    fresh.finish(SENTENCE)
+
+    assert list(fresh.drain()) == [SENTENCE.encode()]
+    assert done.index(SENTENCE) < 6
+    assert len(list(busy.drain())) == 20
@@ -0,0 +1,44 @@
+import pytest
+
+import fakes
+from fakes import app
+
+@pytest.fixture
+def uploads(settings):
+    manager = app.FileUploadManager(clients=app.GEMINI_CLIENTS, max_workers=2)
+    yield manager
+    manager.executor.shutdown()
+
+@pytest.fixture
+def resume(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4 resume\n" * 100)
+    return str(path)
+
+def test_same_file_is_uploaded_once(uploads, resume):
+    first = uploads.submit("test-key", resume).result()
+    assert uploads.submit("test-key", resume).result() is first
+    assert uploads.snapshot()["hits"] == 1
+
+def test_handles_are_per_api_key(uploads, resume):
+    uploads.submit("key-a", resume).result()
+    uploads.submit("key-b", resume).result()
+    assert uploads.snapshot()["misses"] == 2
+
+def test_failed_upload_is_not_cached(uploads, resume, monkeypatch):
+    def fail(self, path, mime_type=None):
+        raise fakes.FakeApiError(503)
+    with monkeypatch.context() as patch:
+        patch.setattr(fakes.FakeGeminiClient, "upload_file", fail)
+        with pytest.raises(fakes.FakeApiError):
+            uploads.submit("test-key", resume).result()
+    assert uploads.snapshot()["cached"] == 0
+
+    handle = uploads.submit("test-key", resume).result()
+    assert isinstance(handle, fakes.FakeFile)
+    assert uploads.snapshot()["misses"] == 2
+
+def test_missing_api_key(uploads, resume, monkeypatch):
+    monkeypatch.setattr(app, "API_KEY", None)
+    with pytest.raises(ValueError):
+        uploads.submit("", resume).result()